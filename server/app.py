@@ -4,36 +4,177 @@ CommuteTimely Server
 Flask-based REST API for ML leave-time predictions, auth, and cloud sync
 """
 
-from flask import Flask, request, jsonify
+# Patch blocking stdlib I/O before anything else imports it
+from gevent import monkey
+monkey.patch_all()
+
+from gevent.pool import Pool
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from werkzeug.exceptions import BadRequest, HTTPException
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
 from functools import wraps
 import math
-from typing import Dict, Any, Optional
+import numpy as np
+import orjson
+from numba import njit
+from typing import Dict, Any, List, Optional
 import auth_service
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; datetimes serialize as RFC 3339 with a Z suffix"""
+
+    option = orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode('utf-8')
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for iOS app
 
 # Configuration
 app.config['JSON_SORT_KEYS'] = False
 
+_UTC = timezone.utc
+
+# Prediction lookup tables, indexed by congestion level (0-4)
+_CONGESTION_MULT = (1.0, 1.05, 1.15, 1.30, 1.50)
+_CONGESTION_PEN = (0.0, 0.05, 0.10, 0.15, 0.25)
+_TRAFFIC_DESC = ("clear roads", "light traffic", "moderate traffic", "heavy traffic", "severe traffic")
+_MAX_CONGESTION = len(_CONGESTION_MULT) - 1
+_CONGESTION_MULT_ARR = np.array(_CONGESTION_MULT)
+_CONGESTION_PEN_ARR = np.array(_CONGESTION_PEN)
+
+# Threshold adjustment tables, indexed by how many thresholds the input crosses
+_PRECIP_MULT_ADJ = np.array((0.0, 0.08, 0.15))    # precipitation > 30, > 60
+_VISIBILITY_MULT_ADJ = np.array((0.0, 0.05, 0.10))  # visibility < 10, < 5
+_WEATHER_PEN = np.array((0.0, 0.08, 0.15))         # weather score < 70, < 50
+_PRECIP_PEN = np.array((0.0, 0.05, 0.10))          # precipitation > 40, > 70
+_HORIZON_PEN = np.array((0.0, 0.05, 0.10))         # hours until arrival > 2, > 4
+_CONGESTION_BUFFER_MULT = np.array((1.0, 1.5))     # congestion >= 3
+_PRECIP_BUFFER_MULT = np.array((1.0, 1.3))         # precipitation > 50
+
+# Batches smaller than this run through the scalar kernel; NumPy's per-call overhead dominates below it
+_BULK_VECTORIZE_MIN = 20
+
+# Upper bound on entries per /predict/bulk request
+_BULK_PREDICT_MAX = 1000
+
+# Explicit signature compiles the kernel at import, so no request pays JIT cost
+_PREDICT_CORE_SIGNATURE = 'UniTuple(float64, 3)(float64, float64, int64, int64, float64, float64, float64, float64)'
+
+_REQUIRED_PREDICT_FIELDS = frozenset(('origin', 'destination', 'arrival_time', 'route_features', 'weather_features'))
+_REQUIRED_ROUTE_FIELDS = frozenset(('distance', 'baseline_duration', 'current_traffic_delay', 'incident_count', 'congestion_level'))
+_REQUIRED_WEATHER_FIELDS = frozenset(('weather_score', 'precipitation_probability', 'visibility'))
+
+_FIVE_MIN = timedelta(minutes=5)
+_TEN_MIN = timedelta(minutes=10)
+
+
+@dataclass(slots=True)
+class AlternativeLeaveTime:
+    """Alternative departure option; serialized by orjson without an intermediate dict"""
+    leave_time: datetime
+    arrival_probability: float
+    description: str
+
+
+def _json_response(obj: Any, status: int = 200) -> Response:
+    """
+    Serialize obj straight to bytes with orjson
+    
+    The body is never decoded to str and re-encoded, and Content-Length is known up front,
+    so keep-alive connections never fall back to chunked transfer encoding.
+    """
+    body = orjson.dumps(obj, option=ORJSONProvider.option)
+    return Response(body, status=status, mimetype='application/json',
+                    headers={'Content-Length': str(len(body))})
+
+
+def _parse_json_body() -> Any:
+    """Parse the request body with orjson, bypassing Flask's content-type sniffing"""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as e:
+        raise BadRequest(f'Invalid JSON body: {e}')
+
+
+# MARK: - Error Handlers
+
+@app.errorhandler(HTTPException)
+def handle_http_error(e: HTTPException):
+    """Render HTTP errors (bad JSON, unknown routes) as JSON"""
+    return _json_response({'error': e.description}, e.code)
+
+
+@app.errorhandler(KeyError)
+def handle_key_error(e: KeyError):
+    """Missing keys in the request payload"""
+    return _json_response({'error': f'Invalid data format: {str(e)}'}, 400)
+
+
+@app.errorhandler(ValueError)
+def handle_value_error(e: ValueError):
+    """Invalid input raised by handlers or auth_service"""
+    return _json_response({'error': str(e)}, 400)
+
+
+@app.errorhandler(auth_service.InvalidCredentialsError)
+def handle_invalid_credentials(e: auth_service.InvalidCredentialsError):
+    """Wrong password"""
+    return _json_response({'error': str(e)}, 401)
+
+
+@app.errorhandler(auth_service.UserNotFoundError)
+def handle_user_not_found(e: auth_service.UserNotFoundError):
+    """Unknown user"""
+    return _json_response({'error': str(e)}, 404)
+
+
+@app.errorhandler(auth_service.EmailInUseError)
+def handle_email_in_use(e: auth_service.EmailInUseError):
+    """Email already registered"""
+    return _json_response({'error': str(e)}, 409)
+
+
+@app.errorhandler(Exception)
+def handle_unexpected_error(e: Exception):
+    """Anything else is a server fault; log it with the traceback"""
+    app.logger.exception('Unhandled error on %s %s', request.method, request.path)
+    return _json_response({'error': f'Internal server error: {str(e)}'}, 500)
+
 
 # MARK: - Auth Middleware
 
+def _current_user() -> Dict[str, Any]:
+    """Return the authenticated user's record, raising UserNotFoundError if it no longer exists"""
+    user = auth_service.users_db.get(request.user_id)
+    if not user:
+        raise auth_service.UserNotFoundError('User not found')
+    return user
+
+
 def require_auth(f):
     """Decorator to require authentication for endpoints"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Missing or invalid authorization header'}), 401
+            return _json_response({'error': 'Missing or invalid authorization header'}, 401)
         
         token = auth_header.split(' ')[1]
         user_id = auth_service.verify_jwt_token(token)
         
         if not user_id:
-            return jsonify({'error': 'Invalid or expired token'}), 401
+            return _json_response({'error': 'Invalid or expired token'}, 401)
         
         # Add user_id to request context
         request.user_id = user_id
@@ -42,15 +183,17 @@ def require_auth(f):
     return decorated_function
 
 
+# Everything but the timestamp is static, so /health is rendered by byte concatenation
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","service":"CommuteTimely Prediction API","version":"1.0.0"}'
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'service': 'CommuteTimely Prediction API',
-        'version': '1.0.0'
-    })
+    timestamp = datetime.now(_UTC).strftime('%Y-%m-%dT%H:%M:%SZ').encode('ascii')
+    body = _HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX
+    return Response(body, mimetype='application/json', headers={'Content-Length': str(len(body))})
 
 
 @app.route('/predict', methods=['POST'])
@@ -60,72 +203,191 @@ def predict():
     
     Accepts trip details and returns recommended leave time with confidence score
     """
+    data = _parse_json_body()
+    prediction = _predict_one(data, datetime.now(_UTC))
+    return _json_response(prediction)
+
+
+@app.route('/predict/bulk', methods=['POST'])
+def predict_bulk():
+    """
+    Batch prediction endpoint
+    
+    Accepts {"requests": [...]} and returns {"predictions": [...]} in the same order.
+    An invalid entry yields an inline {"error": ...} instead of failing the whole batch.
+    """
+    data = _parse_json_body()
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    items = data['requests']
+    if not isinstance(items, list):
+        raise ValueError('requests must be a list')
+    if len(items) > _BULK_PREDICT_MAX:
+        raise ValueError(f'At most {_BULK_PREDICT_MAX} requests per batch')
+    now = datetime.now(_UTC)
+    
+    predictions = [None] * len(items)
+    valid_indices = []
+    valid_requests = []
+    # Local aliases avoid global/attribute lookups on every iteration
+    parse_request = _parse_prediction_request
+    add_index = valid_indices.append
+    add_request = valid_requests.append
+    for i, item in enumerate(items):
+        try:
+            add_request(parse_request(item, now))
+            add_index(i)
+        except KeyError as e:
+            predictions[i] = {'error': f'Invalid data format: {str(e)}'}
+        except (ValueError, TypeError) as e:
+            predictions[i] = {'error': str(e)}
+    
+    if len(valid_requests) >= _BULK_VECTORIZE_MIN:
+        results = _predict_batch(valid_requests)
+    else:
+        results = [_predict_safe(params) for params in valid_requests]
+    for i, result in zip(valid_indices, results):
+        predictions[i] = result
+    
+    return _json_response({'predictions': predictions})
+
+
+def _predict_safe(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the model on parsed params, returning an inline error for results out of range"""
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['origin', 'destination', 'arrival_time', 'route_features', 'weather_features']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Extract features
-        route = data['route_features']
-        weather = data['weather_features']
-        arrival_time = datetime.fromisoformat(data['arrival_time'].replace('Z', '+00:00'))
-        current_time = datetime.fromisoformat(data.get('current_time', datetime.utcnow().isoformat()).replace('Z', '+00:00'))
-        
-        # Calculate prediction
-        prediction = calculate_leave_time(
-            arrival_time=arrival_time,
-            current_time=current_time,
-            distance=route['distance'],
-            baseline_duration=route['baseline_duration'],
-            traffic_delay=route['current_traffic_delay'],
-            incident_count=route['incident_count'],
-            congestion_level=route['congestion_level'],
-            weather_score=weather['weather_score'],
-            precipitation_prob=weather['precipitation_probability'],
-            visibility=weather['visibility']
-        )
-        
-        return jsonify(prediction), 200
-        
-    except KeyError as e:
-        return jsonify({'error': f'Invalid data format: {str(e)}'}), 400
-    except Exception as e:
-        return jsonify({'error': f'Internal server error: {str(e)}'}), 500
+        return calculate_leave_time(**params)
+    except ValueError as e:
+        return {'error': str(e)}
 
 
-def calculate_leave_time(
-    arrival_time: datetime,
-    current_time: datetime,
-    distance: float,
+def _predict_one(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Validate a single prediction request and run the model on it"""
+    return calculate_leave_time(**_parse_prediction_request(data, now))
+
+
+def _require_fields(data: Dict[str, Any], required: frozenset, context: str) -> None:
+    """Raise ValueError listing every required key missing from data"""
+    missing = required.difference(data)
+    if missing:
+        raise ValueError(f"Missing required {context}: {', '.join(sorted(missing))}")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, treating one without an offset as UTC"""
+    # Python 3.11+ parses the trailing 'Z' natively
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_UTC)
+    return dt
+
+
+def _parse_prediction_request(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """
+    Validate a prediction request and extract the model inputs
+    
+    Args:
+        data: Parsed request body
+        now: Request timestamp, used when the client omits current_time
+    
+    Returns:
+        Keyword arguments for calculate_leave_time
+    """
+    try:
+        return _extract_prediction_inputs(data, now)
+    except TypeError as e:
+        # Wrong JSON types (null, arrays or objects where numbers belong) are client errors
+        raise ValueError(f'Invalid data format: {e}') from None
+
+
+def _extract_prediction_inputs(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Body of _parse_prediction_request; may raise TypeError on wrongly typed input"""
+    
+    # Validate required fields
+    _require_fields(data, _REQUIRED_PREDICT_FIELDS, 'fields')
+    
+    # Extract features
+    route = data['route_features']
+    weather = data['weather_features']
+    _require_fields(route, _REQUIRED_ROUTE_FIELDS, 'route_features fields')
+    _require_fields(weather, _REQUIRED_WEATHER_FIELDS, 'weather_features fields')
+    arrival_time = _parse_timestamp(data['arrival_time'])
+    current_time = _parse_timestamp(data['current_time']) if 'current_time' in data else now
+    
+    congestion_level = int(route['congestion_level'])
+    if not 0 <= congestion_level <= _MAX_CONGESTION:
+        raise ValueError(f"congestion_level must be between 0 and {_MAX_CONGESTION}")
+    
+    return {
+        'arrival_time': arrival_time,
+        'current_time': current_time,
+        'time_until_arrival': (arrival_time - current_time).total_seconds(),
+        'distance': float(route['distance']),
+        'baseline_duration': float(route['baseline_duration']),
+        'traffic_delay': float(route['current_traffic_delay']),
+        'incident_count': int(route['incident_count']),
+        'congestion_level': congestion_level,
+        'weather_score': float(weather['weather_score']),
+        'precipitation_prob': float(weather['precipitation_probability']),
+        'visibility': float(weather['visibility'])
+    }
+
+
+def _predict_batch(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run the model over many parsed requests at once using column-wise NumPy arithmetic"""
+    
+    features = np.array([
+        (
+            params['baseline_duration'],
+            params['traffic_delay'],
+            params['incident_count'],
+            params['congestion_level'],
+            params['weather_score'],
+            params['precipitation_prob'],
+            params['visibility'],
+            params['time_until_arrival']
+        )
+        for params in requests
+    ], dtype=np.float64)
+    
+    travel_times, buffers, confidences = _predict_core_batch(*features.T)
+    
+    build_prediction = _build_prediction
+    results = []
+    for params, travel_time, buffer_seconds, confidence in zip(
+            requests, travel_times.tolist(), buffers.tolist(), confidences.tolist()):
+        try:
+            results.append(build_prediction(
+                arrival_time=params['arrival_time'],
+                current_time=params['current_time'],
+                travel_time=travel_time,
+                buffer_seconds=buffer_seconds,
+                confidence=confidence,
+                congestion_level=params['congestion_level'],
+                weather_score=params['weather_score'],
+                precipitation_prob=params['precipitation_prob']
+            ))
+        except ValueError as e:
+            results.append({'error': str(e)})
+    return results
+
+
+# No fastmath: strict IEEE ordering keeps results bit-identical to _predict_core_batch
+@njit(_PREDICT_CORE_SIGNATURE, cache=True)
+def _predict_core(
     baseline_duration: float,
     traffic_delay: float,
     incident_count: int,
     congestion_level: int,
     weather_score: float,
     precipitation_prob: float,
-    visibility: float
-) -> Dict[str, Any]:
+    visibility: float,
+    time_until_arrival: float
+):
     """
-    Calculate recommended leave time using heuristic model
-    
-    Args:
-        arrival_time: Target arrival datetime
-        current_time: Current datetime
-        distance: Route distance in meters
-        baseline_duration: Normal travel time in seconds
-        traffic_delay: Current traffic delay in seconds
-        incident_count: Number of traffic incidents
-        congestion_level: Traffic congestion (0-4)
-        weather_score: Weather quality score (0-100)
-        precipitation_prob: Precipitation probability (0-100)
-        visibility: Visibility in km
-    
+    Numeric core of the heuristic model, compiled to machine code by Numba
+
     Returns:
-        Prediction dictionary with leave time, confidence, and explanation
+        (travel_time, buffer_seconds, confidence) tuple
     """
     
     # Start with baseline + current traffic
@@ -133,21 +395,15 @@ def calculate_leave_time(
     
     # Weather adjustment
     weather_multiplier = 1.0
-    if precipitation_prob > 60:
-        weather_multiplier += 0.15
-    elif precipitation_prob > 30:
-        weather_multiplier += 0.08
-    
-    if visibility < 5:
-        weather_multiplier += 0.10
-    elif visibility < 10:
-        weather_multiplier += 0.05
+    weather_multiplier += _PRECIP_MULT_ADJ[(precipitation_prob > 30) + (precipitation_prob > 60)]
+    weather_multiplier += _VISIBILITY_MULT_ADJ[(visibility < 10) + (visibility < 5)]
     
     travel_time *= weather_multiplier
     
     # Congestion adjustment
-    congestion_multipliers = [1.0, 1.05, 1.15, 1.30, 1.50]
-    travel_time *= congestion_multipliers[min(congestion_level, 4)]
+    # Clamp both ends: Numba does not bounds-check array indexing
+    congestion_index = max(0, min(congestion_level, _MAX_CONGESTION))
+    travel_time *= _CONGESTION_MULT_ARR[congestion_index]
     
     # Incident adjustment
     travel_time += incident_count * 120  # 2 minutes per incident
@@ -157,28 +413,168 @@ def calculate_leave_time(
     variability_buffer = travel_time * 0.15  # 15% of travel time
     
     # Increase buffer for uncertain conditions
-    if congestion_level >= 3:
-        variability_buffer *= 1.5
-    if precipitation_prob > 50:
-        variability_buffer *= 1.3
+    variability_buffer *= _CONGESTION_BUFFER_MULT[int(congestion_level >= 3)]
+    variability_buffer *= _PRECIP_BUFFER_MULT[int(precipitation_prob > 50)]
     
     buffer_seconds = base_buffer + variability_buffer
-    buffer_minutes = int(buffer_seconds / 60)
     
-    # Total time needed
-    total_time_needed = travel_time + buffer_seconds
+    # Confidence score (0.0 to 1.0)
+    confidence = 0.85  # Base confidence
     
-    # Calculate leave time
-    leave_time = arrival_time - timedelta(seconds=total_time_needed)
+    # Reduce confidence for congestion
+    confidence -= _CONGESTION_PEN_ARR[congestion_index]
     
-    # Calculate confidence
-    confidence = calculate_confidence(
+    # Reduce confidence for bad weather
+    confidence -= _WEATHER_PEN[(weather_score < 70) + (weather_score < 50)]
+    
+    # Reduce confidence for precipitation
+    confidence -= _PRECIP_PEN[(precipitation_prob > 40) + (precipitation_prob > 70)]
+    
+    # Reduce confidence for incidents
+    confidence -= min(0.15, incident_count * 0.03)
+    
+    # Reduce confidence for predictions far in the future
+    hours_until = time_until_arrival / 3600
+    confidence -= _HORIZON_PEN[(hours_until > 2) + (hours_until > 4)]
+    
+    confidence = max(0.40, min(0.98, confidence))
+    
+    return travel_time, buffer_seconds, confidence
+
+
+def _predict_core_batch(
+    baseline_duration: np.ndarray,
+    traffic_delay: np.ndarray,
+    incident_count: np.ndarray,
+    congestion_level: np.ndarray,
+    weather_score: np.ndarray,
+    precipitation_prob: np.ndarray,
+    visibility: np.ndarray,
+    time_until_arrival: np.ndarray
+):
+    """
+    Vectorised counterpart of _predict_core over equal-length feature columns
+
+    Returns:
+        (travel_time, buffer_seconds, confidence) tuple of arrays
+    """
+    
+    incident_count = incident_count.astype(np.int64)
+    congestion_level = congestion_level.astype(np.int64)
+    
+    # Weather adjustment
+    weather_multiplier = (
+        1.0
+        + _PRECIP_MULT_ADJ[np.add(precipitation_prob > 30, precipitation_prob > 60, dtype=np.intp)]
+        + _VISIBILITY_MULT_ADJ[np.add(visibility < 10, visibility < 5, dtype=np.intp)]
+    )
+    travel_time = (baseline_duration + traffic_delay) * weather_multiplier
+    
+    # Congestion and incident adjustment
+    congestion_index = np.clip(congestion_level, 0, _MAX_CONGESTION)
+    travel_time *= _CONGESTION_MULT_ARR[congestion_index]
+    travel_time += incident_count * 120
+    
+    # Buffer based on variability
+    variability_buffer = travel_time * 0.15
+    variability_buffer *= _CONGESTION_BUFFER_MULT[(congestion_level >= 3).astype(np.intp)]
+    variability_buffer *= _PRECIP_BUFFER_MULT[(precipitation_prob > 50).astype(np.intp)]
+    buffer_seconds = 300 + variability_buffer
+    
+    # Confidence score
+    hours_until = time_until_arrival / 3600
+    confidence = (
+        0.85
+        - _CONGESTION_PEN_ARR[congestion_index]
+        - _WEATHER_PEN[np.add(weather_score < 70, weather_score < 50, dtype=np.intp)]
+        - _PRECIP_PEN[np.add(precipitation_prob > 40, precipitation_prob > 70, dtype=np.intp)]
+        - np.minimum(0.15, incident_count * 0.03)
+        - _HORIZON_PEN[np.add(hours_until > 2, hours_until > 4, dtype=np.intp)]
+    )
+    confidence = np.clip(confidence, 0.40, 0.98)
+    
+    return travel_time, buffer_seconds, confidence
+
+
+def calculate_leave_time(
+    arrival_time: datetime,
+    current_time: datetime,
+    distance: float,
+    baseline_duration: float,
+    traffic_delay: float,
+    incident_count: int,
+    congestion_level: int,
+    weather_score: float,
+    precipitation_prob: float,
+    visibility: float,
+    time_until_arrival: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Calculate recommended leave time using heuristic model
+    
+    Args:
+        arrival_time: Target arrival datetime
+        current_time: Current datetime
+        distance: Route distance in meters
+        baseline_duration: Normal travel time in seconds
+        traffic_delay: Current traffic delay in seconds
+        incident_count: Number of traffic incidents
+        congestion_level: Traffic congestion (0-4)
+        weather_score: Weather quality score (0-100)
+        precipitation_prob: Precipitation probability (0-100)
+        visibility: Visibility in km
+        time_until_arrival: Seconds from current_time to arrival_time, if already computed
+    
+    Returns:
+        Prediction dictionary with leave time, confidence, and explanation
+    """
+    
+    if time_until_arrival is None:
+        time_until_arrival = (arrival_time - current_time).total_seconds()
+    
+    travel_time, buffer_seconds, confidence = _predict_core(
+        float(baseline_duration),
+        float(traffic_delay),
+        int(incident_count),
+        int(congestion_level),
+        float(weather_score),
+        float(precipitation_prob),
+        float(visibility),
+        time_until_arrival
+    )
+    
+    return _build_prediction(
+        arrival_time=arrival_time,
+        current_time=current_time,
+        travel_time=travel_time,
+        buffer_seconds=buffer_seconds,
+        confidence=confidence,
         congestion_level=congestion_level,
         weather_score=weather_score,
-        precipitation_prob=precipitation_prob,
-        incident_count=incident_count,
-        time_until_arrival=(arrival_time - current_time).total_seconds()
+        precipitation_prob=precipitation_prob
     )
+
+
+def _build_prediction(
+    arrival_time: datetime,
+    current_time: datetime,
+    travel_time: float,
+    buffer_seconds: float,
+    confidence: float,
+    congestion_level: int,
+    weather_score: float,
+    precipitation_prob: float
+) -> Dict[str, Any]:
+    """Assemble the prediction response from the model outputs"""
+    
+    buffer_minutes = int(buffer_seconds / 60)
+    
+    # Calculate leave time; inputs large enough to overflow datetime are a client error
+    try:
+        leave_time = arrival_time - timedelta(seconds=travel_time + buffer_seconds)
+        earliest, latest = leave_time - _TEN_MIN, leave_time + _FIVE_MIN
+    except OverflowError:
+        raise ValueError('Predicted leave time is out of range') from None
     
     # Generate explanation
     explanation = generate_explanation(
@@ -191,73 +587,21 @@ def calculate_leave_time(
     
     # Generate alternative leave times
     alternatives = [
-        {
-            'leave_time': (leave_time - timedelta(minutes=10)).isoformat() + 'Z',
-            'arrival_probability': min(0.98, confidence + 0.15),
-            'description': 'Extra safe: arrive 10 minutes early'
-        },
-        {
-            'leave_time': (leave_time - timedelta(minutes=5)).isoformat() + 'Z',
-            'arrival_probability': min(0.95, confidence + 0.08),
-            'description': 'Safe: arrive 5 minutes early'
-        },
-        {
-            'leave_time': (leave_time + timedelta(minutes=5)).isoformat() + 'Z',
-            'arrival_probability': max(0.50, confidence - 0.20),
-            'description': 'Risky: might arrive 5 minutes late'
-        }
+        AlternativeLeaveTime(earliest, min(0.98, confidence + 0.15), 'Extra safe: arrive 10 minutes early'),
+        AlternativeLeaveTime(leave_time - _FIVE_MIN, min(0.95, confidence + 0.08), 'Safe: arrive 5 minutes early'),
+        AlternativeLeaveTime(latest, max(0.50, confidence - 0.20), 'Risky: might arrive 5 minutes late')
     ]
     
     return {
-        'leave_time': leave_time.isoformat() + 'Z',
+        'leave_time': leave_time,
         'confidence': round(confidence, 2),
         'explanation': explanation,
         'alternative_leaves_times': alternatives,
         'buffer_minutes': buffer_minutes,
-        'calculated_at': current_time.isoformat() + 'Z'
+        'calculated_at': current_time
     }
 
 
-def calculate_confidence(
-    congestion_level: int,
-    weather_score: float,
-    precipitation_prob: float,
-    incident_count: int,
-    time_until_arrival: float
-) -> float:
-    """Calculate prediction confidence score (0.0 to 1.0)"""
-    
-    confidence = 0.85  # Base confidence
-    
-    # Reduce confidence for congestion
-    congestion_penalties = [0, 0.05, 0.10, 0.15, 0.25]
-    confidence -= congestion_penalties[min(congestion_level, 4)]
-    
-    # Reduce confidence for bad weather
-    if weather_score < 50:
-        confidence -= 0.15
-    elif weather_score < 70:
-        confidence -= 0.08
-    
-    # Reduce confidence for precipitation
-    if precipitation_prob > 70:
-        confidence -= 0.10
-    elif precipitation_prob > 40:
-        confidence -= 0.05
-    
-    # Reduce confidence for incidents
-    confidence -= min(0.15, incident_count * 0.03)
-    
-    # Reduce confidence for predictions far in the future
-    hours_until = time_until_arrival / 3600
-    if hours_until > 4:
-        confidence -= 0.10
-    elif hours_until > 2:
-        confidence -= 0.05
-    
-    return max(0.40, min(0.98, confidence))
-
-
 def generate_explanation(
     travel_time: float,
     buffer_minutes: int,
@@ -274,9 +618,9 @@ def generate_explanation(
     parts.append(f"{travel_mins} min travel")
     
     # Traffic
-    traffic_descriptions = ["clear roads", "light traffic", "moderate traffic", "heavy traffic", "severe traffic"]
-    if congestion_level > 0:
-        parts.append(traffic_descriptions[min(congestion_level, 4)])
+    congestion_index = max(0, min(congestion_level, _MAX_CONGESTION))
+    if congestion_index > 0:
+        parts.append(_TRAFFIC_DESC[congestion_index])
     
     # Weather
     if precipitation_prob > 50:
@@ -294,172 +638,208 @@ def generate_explanation(
 
 # MARK: - Authentication Endpoints
 
+# Upper bound on concurrent provider verifications per /auth/link/batch request
+_LINK_BATCH_CONCURRENCY = 8
+
+# Upper bound on entries per /auth/link/batch request; there are only a handful of providers
+_LINK_BATCH_MAX = 10
+
+
 @app.route('/auth/apple', methods=['POST'])
 def auth_apple():
     """Exchange Apple identity token for app access token"""
-    try:
-        data = request.get_json()
-        id_token = data.get('id_token')
-        nonce = data.get('nonce')
-        user_data = data.get('user', {})
-        
-        if not id_token or not nonce:
-            return jsonify({'error': 'Missing id_token or nonce'}), 400
-        
-        result = auth_service.authenticate_with_apple(id_token, nonce, user_data)
-        return jsonify(result), 200
-        
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        return jsonify({'error': f'Authentication failed: {str(e)}'}), 500
+    data = _parse_json_body()
+    id_token = data.get('id_token')
+    nonce = data.get('nonce')
+    user_data = data.get('user', {})
+    
+    if not id_token or not nonce:
+        return _json_response({'error': 'Missing id_token or nonce'}, 400)
+    
+    result = auth_service.authenticate_with_apple(id_token, nonce, user_data)
+    return _json_response(result)
 
 
 @app.route('/auth/google', methods=['POST'])
 def auth_google():
     """Exchange Google ID token for app access token"""
-    try:
-        data = request.get_json()
-        id_token = data.get('id_token')
-        user_data = data.get('user', {})
-        
-        if not id_token:
-            return jsonify({'error': 'Missing id_token'}), 400
-        
-        result = auth_service.authenticate_with_google(id_token, user_data)
-        return jsonify(result), 200
-        
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        return jsonify({'error': f'Authentication failed: {str(e)}'}), 500
+    data = _parse_json_body()
+    id_token = data.get('id_token')
+    user_data = data.get('user', {})
+    
+    if not id_token:
+        return _json_response({'error': 'Missing id_token'}, 400)
+    
+    result = auth_service.authenticate_with_google(id_token, user_data)
+    return _json_response(result)
 
 
 @app.route('/auth/email/signup', methods=['POST'])
 def auth_email_signup():
     """Create new account with email/password"""
-    try:
-        data = request.get_json()
-        email = data.get('email')
-        password = data.get('password')
-        display_name = data.get('display_name')
-        
-        if not email or not password:
-            return jsonify({'error': 'Missing email or password'}), 400
-        
-        result = auth_service.create_email_user(email, password, display_name)
-        return jsonify(result), 201
-        
-    except ValueError as e:
-        if 'already in use' in str(e):
-            return jsonify({'error': str(e)}), 409
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        return jsonify({'error': f'Signup failed: {str(e)}'}), 500
+    data = _parse_json_body()
+    email = data.get('email')
+    password = data.get('password')
+    display_name = data.get('display_name')
+    
+    if not email or not password:
+        return _json_response({'error': 'Missing email or password'}, 400)
+    
+    result = auth_service.create_email_user(email, password, display_name)
+    return _json_response(result, 201)
 
 
 @app.route('/auth/email/signin', methods=['POST'])
 def auth_email_signin():
     """Sign in with email/password"""
-    try:
-        data = request.get_json()
-        email = data.get('email')
-        password = data.get('password')
-        
-        if not email or not password:
-            return jsonify({'error': 'Missing email or password'}), 400
-        
-        result = auth_service.authenticate_with_email(email, password)
-        return jsonify(result), 200
-        
-    except ValueError as e:
-        if 'not found' in str(e):
-            return jsonify({'error': str(e)}), 404
-        return jsonify({'error': str(e)}), 401
-    except Exception as e:
-        return jsonify({'error': f'Sign-in failed: {str(e)}'}), 500
+    data = _parse_json_body()
+    email = data.get('email')
+    password = data.get('password')
+    
+    if not email or not password:
+        return _json_response({'error': 'Missing email or password'}, 400)
+    
+    result = auth_service.authenticate_with_email(email, password)
+    return _json_response(result)
 
 
 @app.route('/auth/link', methods=['POST'])
 @require_auth
 def auth_link():
     """Link additional provider to existing account"""
-    try:
-        data = request.get_json()
-        provider = data.get('provider')
+    data = _parse_json_body()
+    provider, provider_data = _verify_link_entry(data)
+    
+    result = auth_service.link_provider_to_user(request.user_id, provider, provider_data)
+    return _json_response(result)
+
+
+@app.route('/auth/link/batch', methods=['POST'])
+@require_auth
+def auth_link_batch():
+    """
+    Link several providers to an existing account in one request
+    
+    Accepts {"providers": [...]} where each entry has the same shape as an /auth/link body.
+    Provider tokens are verified concurrently; results are returned in request order,
+    with an inline {"error": ...} for any entry that could not be linked.
+    """
+    data = _parse_json_body()
+    entries = data.get('providers')
+    
+    if not entries:
+        return _json_response({'error': 'Missing providers'}, 400)
+    if not isinstance(entries, list):
+        return _json_response({'error': 'providers must be a list'}, 400)
+    if len(entries) > _LINK_BATCH_MAX:
+        return _json_response({'error': f'At most {_LINK_BATCH_MAX} providers per batch'}, 400)
+    
+    user_id = request.user_id
+    results = [None] * len(entries)
+    
+    # Turn away providers that are already linked or repeated before paying for verification
+    # (a password entry costs a full Argon2 hash)
+    seen = set(_current_user()['providers'])
+    pending_indices = []
+    pending_entries = []
+    for i, entry in enumerate(entries):
+        provider = entry.get('provider') if isinstance(entry, dict) else None
+        if provider in seen:
+            results[i] = {'error': f'Provider {provider} already linked'}
+            continue
+        if isinstance(provider, str):
+            seen.add(provider)
+        pending_indices.append(i)
+        pending_entries.append(entry)
+    
+    for i, verified in zip(pending_indices, _verify_many(pending_entries)):
+        if isinstance(verified, Exception):
+            results[i] = {'error': str(verified)}
+            continue
+        
+        provider, provider_data = verified
+        try:
+            results[i] = auth_service.link_provider_to_user(user_id, provider, provider_data)
+        except ValueError as e:
+            results[i] = {'error': str(e)}
+    
+    return _json_response({'results': results})
+
+
+def _verify_link_entry(data: Dict[str, Any]) -> tuple[str, Dict[str, Any]]:
+    """
+    Verify the credentials in a single provider link request
+    
+    Returns:
+        (provider, provider_data) for auth_service.link_provider_to_user
+    """
+    provider = data.get('provider')
+    
+    if not provider:
+        raise ValueError('Missing provider')
+    
+    if provider == 'apple':
+        id_token = data.get('id_token')
+        nonce = data.get('nonce')
+        if not id_token or not nonce:
+            raise ValueError('Missing id_token or nonce')
         
-        if not provider:
-            return jsonify({'error': 'Missing provider'}), 400
+        auth_service.verify_apple_token(id_token, nonce)
+        return provider, data.get('user', {})
         
-        user_id = request.user_id
-        provider_data = {}
+    elif provider == 'google':
+        id_token = data.get('id_token')
+        if not id_token:
+            raise ValueError('Missing id_token')
         
-        if provider == 'apple':
-            id_token = data.get('id_token')
-            nonce = data.get('nonce')
-            if not id_token or not nonce:
-                return jsonify({'error': 'Missing id_token or nonce'}), 400
-            
-            verified = auth_service.verify_apple_token(id_token, nonce)
-            provider_data = data.get('user', {})
-            
-        elif provider == 'google':
-            id_token = data.get('id_token')
-            if not id_token:
-                return jsonify({'error': 'Missing id_token'}), 400
-            
-            verified = auth_service.verify_google_token(id_token)
-            provider_data = data.get('user', {})
-            
-        elif provider == 'password':
-            email = data.get('email')
-            password = data.get('password')
-            if not email or not password:
-                return jsonify({'error': 'Missing email or password'}), 400
-            
-            # Check if email already exists
-            if email in auth_service.email_passwords:
-                return jsonify({'error': 'Email already in use'}), 409
-            
-            # Hash and store password
-            hashed_password = auth_service.hash_password(password)
-            auth_service.email_passwords[email] = hashed_password
-            provider_data = {'email': email}
-        else:
-            return jsonify({'error': f'Unknown provider: {provider}'}), 400
+        auth_service.verify_google_token(id_token)
+        return provider, data.get('user', {})
         
-        result = auth_service.link_provider_to_user(user_id, provider, provider_data)
-        return jsonify(result), 200
+    elif provider == 'password':
+        email = data.get('email')
+        password = data.get('password')
+        if not email or not password:
+            raise ValueError('Missing email or password')
+        auth_service.check_password_length(password)
         
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
+        # Check if email already exists; link_provider_to_user re-checks before storing the hash
+        if auth_service.email_in_use(email):
+            raise auth_service.EmailInUseError('Email already in use')
+        
+        return provider, {'email': email, 'password_hash': auth_service.hash_password(password)}
+    
+    raise ValueError(f'Unknown provider: {provider}')
+
+
+def _verify_link_entry_safe(data: Dict[str, Any]) -> tuple[str, Dict[str, Any]] | Exception:
+    """Like _verify_link_entry, but returns the failure instead of raising it"""
+    try:
+        return _verify_link_entry(data)
     except Exception as e:
-        return jsonify({'error': f'Linking failed: {str(e)}'}), 500
+        return e
+
+
+def _verify_many(entries: List[Dict[str, Any]]) -> List[tuple[str, Dict[str, Any]] | Exception]:
+    """Verify several link requests concurrently, preserving request order"""
+    pool = Pool(size=_LINK_BATCH_CONCURRENCY)
+    return list(pool.imap(_verify_link_entry_safe, entries))
 
 
 @app.route('/auth/me', methods=['GET'])
 @require_auth
 def auth_me():
     """Get current user profile"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({
-            'user_id': user['user_id'],
-            'email': user.get('email'),
-            'display_name': user.get('display_name'),
-            'photo_url': user.get('photo_url'),
-            'providers': user['providers'],
-            'created_at': user['created_at'],
-            'last_sign_in': user['last_sign_in']
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to fetch user: {str(e)}'}), 500
+    user = _current_user()
+    
+    return _json_response({
+        'user_id': user['user_id'],
+        'email': user.get('email'),
+        'display_name': user.get('display_name'),
+        'photo_url': user.get('photo_url'),
+        'providers': user['providers'],
+        'created_at': user['created_at'],
+        'last_sign_in': user['last_sign_in']
+    })
 
 
 # MARK: - Cloud Sync Endpoints
@@ -468,116 +848,83 @@ def auth_me():
 @require_auth
 def sync_get_trips():
     """Get user's synced trips"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({
-            'trips': user.get('trips', []),
-            'synced_at': datetime.utcnow().isoformat() + 'Z'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to fetch trips: {str(e)}'}), 500
+    user = _current_user()
+    
+    return _json_response({
+        'trips': list(user['trips'].values()),
+        'synced_at': datetime.now(_UTC)
+    })
 
 
 @app.route('/sync/trips', methods=['POST'])
 @require_auth
 def sync_save_trips():
     """Save/update user's trips"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        trips = data.get('trips', [])
-        
-        # Merge trips (simple replace for now, could implement smarter merging)
-        user['trips'] = trips
-        
-        return jsonify({
-            'success': True,
-            'trips_count': len(trips),
-            'synced_at': datetime.utcnow().isoformat() + 'Z'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to save trips: {str(e)}'}), 500
+    user = _current_user()
+    
+    data = _parse_json_body()
+    trips = data.get('trips', [])
+    
+    if not isinstance(trips, list) or not all(isinstance(trip, dict) for trip in trips):
+        return _json_response({'error': 'trips must be a list of objects'}, 400)
+    # Ids must be strings: they key the trip store and DELETE /sync/trips/<trip_id> matches them as text
+    if any(not isinstance(trip.get('id'), str) for trip in trips):
+        return _json_response({'error': 'Each trip requires a string id'}, 400)
+    
+    # Merge trips by ID; deletions go through DELETE /sync/trips/<trip_id>
+    user_trips = user['trips']
+    for trip in trips:
+        user_trips[trip['id']] = trip
+    
+    return _json_response({
+        'success': True,
+        'trips_count': len(user_trips),
+        'synced_at': datetime.now(_UTC)
+    })
 
 
 @app.route('/sync/trips/<trip_id>', methods=['DELETE'])
 @require_auth
 def sync_delete_trip(trip_id):
     """Delete a specific trip"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Filter out the trip with matching ID
-        user['trips'] = [t for t in user.get('trips', []) if t.get('id') != trip_id]
-        
-        return jsonify({
-            'success': True,
-            'deleted_id': trip_id
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to delete trip: {str(e)}'}), 500
+    user = _current_user()
+    
+    user['trips'].pop(trip_id, None)
+    
+    return _json_response({
+        'success': True,
+        'deleted_id': trip_id
+    })
 
 
 @app.route('/sync/preferences', methods=['GET'])
 @require_auth
 def sync_get_preferences():
     """Get user's synced preferences"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({
-            'preferences': user.get('preferences', {}),
-            'synced_at': datetime.utcnow().isoformat() + 'Z'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to fetch preferences: {str(e)}'}), 500
+    user = _current_user()
+    
+    return _json_response({
+        'preferences': user.get('preferences', {}),
+        'synced_at': datetime.now(_UTC)
+    })
 
 
 @app.route('/sync/preferences', methods=['PUT'])
 @require_auth
 def sync_update_preferences():
     """Update user's preferences"""
-    try:
-        user_id = request.user_id
-        user = auth_service.users_db.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        data = request.get_json()
-        preferences = data.get('preferences', {})
-        
-        # Update preferences
-        user['preferences'] = preferences
-        
-        return jsonify({
-            'success': True,
-            'synced_at': datetime.utcnow().isoformat() + 'Z'
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to update preferences: {str(e)}'}), 500
+    user = _current_user()
+    
+    data = _parse_json_body()
+    preferences = data.get('preferences', {})
+    
+    # Update preferences
+    user['preferences'] = preferences
+    
+    return _json_response({
+        'success': True,
+        'synced_at': datetime.now(_UTC)
+    })
 
 
 if __name__ == '__main__':
@@ -591,7 +938,8 @@ if __name__ == '__main__':
     print("    GET  /health  - Health check")
     print("")
     print("  Prediction:")
-    print("    POST /predict - Get leave time prediction")
+    print("    POST /predict      - Get leave time prediction")
+    print("    POST /predict/bulk - Get predictions for a batch of trips")
     print("")
     print("  Authentication:")
     print("    POST /auth/apple          - Sign in with Apple")
@@ -599,6 +947,7 @@ if __name__ == '__main__':
     print("    POST /auth/email/signup   - Sign up with email")
     print("    POST /auth/email/signin   - Sign in with email")
     print("    POST /auth/link           - Link provider (requires auth)")
+    print("    POST /auth/link/batch     - Link several providers (requires auth)")
     print("    GET  /auth/me             - Get user profile (requires auth)")
     print("")
     print("  Cloud Sync:")
@@ -608,6 +957,9 @@ if __name__ == '__main__':
     print("    GET    /sync/preferences    - Get preferences (requires auth)")
     print("    PUT    /sync/preferences    - Update preferences (requires auth)")
     print("=" * 60)
+    print("Development server only; for production run:")
+    print("  gunicorn -c gunicorn_conf.py app:app")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    from gevent.pywsgi import WSGIServer
+    WSGIServer(('0.0.0.0', 5000), app).serve_forever()
 
@@ -6,11 +6,21 @@ Handles Firebase token verification, JWT generation, and user management
 
 import os
 import json
+import base64
 import bcrypt
+import hashlib
+import hmac
+import orjson
 import secrets
-from datetime import datetime, timedelta
+import threading
+import time
+from hmac import compare_digest as secure_compare  # use for every secret comparison, never ==
+from collections import OrderedDict
 from typing import Dict, Any, Optional
-from jose import jwt, JWTError
+from gevent.threadpool import ThreadPoolExecutor
+from passlib.context import CryptContext
+import jwt
+from jwt import InvalidTokenError as JWTError
 import firebase_admin
 from firebase_admin import credentials, auth as firebase_auth
 
@@ -19,23 +29,110 @@ JWT_SECRET = os.environ.get('JWT_SECRET', 'dev-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
 
+# Access tokens always carry the same header, so its encoded form is computed once
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(
+    orjson.dumps({'alg': JWT_ALGORITHM, 'typ': 'JWT'})).rstrip(b'=')
+_JWT_KEY = JWT_SECRET.encode('utf-8')
+
+# Argon2id cost: passes over memory and memory per hash in KiB (lower both for CI/load tests)
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', '3'))
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', '65536'))
+
+# New hashes are Argon2id. bcrypt is deliberately not a passlib scheme: passlib 1.7's bcrypt
+# backend breaks on bcrypt>=4.1, so legacy plain bcrypt hashes are verified directly.
+pwd_ctx = CryptContext(
+    schemes=['argon2'],
+    deprecated='auto',
+    argon2__type='ID',
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=4,
+)
+
+# Hash of a random throwaway password, checked against when an email has no account so that
+# misses cost the same as real sign-ins; built once here rather than on the first miss
+_DUMMY_HASH = pwd_ctx.hash(secrets.token_hex(16)).encode('ascii')
+
+# Longest password accepted; bounds the work an attacker can force per hash
+MAX_PASSWORD_LENGTH = 128
+
+# argon2 and bcrypt release the GIL, so hashing on real OS threads lets concurrent logins
+# overlap while the calling greenlet yields to the gevent hub instead of blocking every request
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+# Legacy hashes written before passlib are plain bcrypt
+_BCRYPT_PREFIX = b'$2'
+
+
+class UserNotFoundError(ValueError):
+    """No user matches the given identifier"""
+
+
+class InvalidCredentialsError(ValueError):
+    """Password does not match the stored hash"""
+
+
+class EmailInUseError(ValueError):
+    """Email is already registered to another account"""
+
+
+class UserStore:
+    """
+    In-memory user_id -> user map split into shards, each guarded by its own lock
+    
+    Writers on different shards never contend, and each shard's dict stays small.
+    """
+    
+    def __init__(self, shard_count: int = 16):
+        self.shards = [({}, threading.Lock()) for _ in range(shard_count)]
+    
+    def _shard(self, user_id: Optional[str]) -> tuple[Dict[str, Dict[str, Any]], threading.Lock]:
+        return self.shards[hash(user_id) % len(self.shards)]
+    
+    def get(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        users, lock = self._shard(user_id)
+        with lock:
+            return users.get(user_id)
+    
+    def put(self, user_id: str, user: Dict[str, Any]) -> None:
+        users, lock = self._shard(user_id)
+        with lock:
+            users[user_id] = user
+
+
 # In-memory user database (replace with real database in production)
-users_db: Dict[str, Dict[str, Any]] = {}
-email_passwords: Dict[str, str] = {}  # email -> hashed_password
+# user_id -> user; password accounts also carry 'password_hash' and 'password_email',
+# the email the password was registered under
+users_db = UserStore()
+email_to_user_id: Dict[str, str] = {}  # email -> user_id (the password account when one exists)
+
+# Set once initialize_firebase has run; see _ensure_firebase
+_fb_initialized = False
+
+# Verified Firebase ID tokens: sha256(id_token) -> (decoded token, cache expiry in epoch seconds)
+_FIREBASE_TOKEN_CACHE: 'OrderedDict[bytes, tuple[Dict[str, Any], float]]' = OrderedDict()
+_FIREBASE_TOKEN_CACHE_MAX = 4096
+_firebase_token_cache_lock = threading.Lock()
+
+# Verified access tokens: sha256(token) -> (user_id, exp); see _decode_jwt
+_JWT_CACHE: 'OrderedDict[bytes, tuple[str, float]]' = OrderedDict()
+_JWT_CACHE_MAX = 4096
+_jwt_cache_lock = threading.Lock()
 
 def initialize_firebase():
     """Initialize Firebase Admin SDK"""
     try:
         # Try to initialize with service account
         cred_path = os.environ.get('FIREBASE_CREDENTIALS_PATH', 'firebase-service-account.json')
-        if os.path.exists(cred_path):
+        try:
             cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-            print("✓ Firebase Admin SDK initialized with service account")
-        else:
+        except FileNotFoundError:
             # Initialize with default credentials for development
             firebase_admin.initialize_app()
             print("✓ Firebase Admin SDK initialized with default credentials")
+        else:
+            firebase_admin.initialize_app(cred)
+            print("✓ Firebase Admin SDK initialized with service account")
     except ValueError:
         # Already initialized
         print("✓ Firebase Admin SDK already initialized")
@@ -44,14 +141,47 @@ def initialize_firebase():
         print("   Mock mode enabled - tokens will be validated locally")
 
 
+def _ensure_firebase():
+    """Initialize Firebase on first use, so importing this module stays cheap"""
+    global _fb_initialized
+    if not _fb_initialized:
+        initialize_firebase()
+        _fb_initialized = True
+
+
+def _verify_firebase_token(id_token: str) -> Dict[str, Any]:
+    """
+    Verify an ID token with Firebase, reusing the result for repeat verifications
+    
+    Entries are keyed by the token's SHA-256 and live until the token's own exp; revocation
+    is not checked, so a verification result holds for the token's whole lifetime.
+    """
+    key = hashlib.sha256(id_token.encode('utf-8')).digest()
+    now = time.time()
+    with _firebase_token_cache_lock:
+        cached = _FIREBASE_TOKEN_CACHE.get(key)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+    
+    decoded_token = firebase_auth.verify_id_token(id_token)
+    
+    with _firebase_token_cache_lock:
+        _FIREBASE_TOKEN_CACHE[key] = (decoded_token, decoded_token.get('exp', now))
+        _FIREBASE_TOKEN_CACHE.move_to_end(key)
+        if len(_FIREBASE_TOKEN_CACHE) > _FIREBASE_TOKEN_CACHE_MAX:
+            _FIREBASE_TOKEN_CACHE.popitem(last=False)
+    return decoded_token
+
+
 def verify_apple_token(id_token: str, nonce: str) -> Dict[str, Any]:
     """Verify Apple Sign-In token with Firebase"""
+    _ensure_firebase()
     try:
         # Verify token with Firebase
-        decoded_token = firebase_auth.verify_id_token(id_token)
+        decoded_token = _verify_firebase_token(id_token)
         
         # Verify nonce matches
-        if decoded_token.get('nonce') != nonce:
+        if not secure_compare((decoded_token.get('nonce') or '').encode('utf-8'), nonce.encode('utf-8')):
             raise ValueError("Nonce mismatch")
         
         return {
@@ -63,9 +193,10 @@ def verify_apple_token(id_token: str, nonce: str) -> Dict[str, Any]:
     except Exception as e:
         # Mock verification for development
         print(f"⚠️  Apple token verification failed: {e}. Using mock mode.")
+        suffix = secrets.token_bytes(12).hex()
         return {
-            'user_id': f"apple_{secrets.token_hex(8)}",
-            'email': f"apple_user_{secrets.token_hex(4)}@privaterelay.appleid.com",
+            'user_id': f"apple_{suffix[:16]}",
+            'email': f"apple_user_{suffix[16:]}@privaterelay.appleid.com",
             'email_verified': True,
             'provider': 'apple.com'
         }
@@ -73,9 +204,10 @@ def verify_apple_token(id_token: str, nonce: str) -> Dict[str, Any]:
 
 def verify_google_token(id_token: str) -> Dict[str, Any]:
     """Verify Google Sign-In token with Firebase"""
+    _ensure_firebase()
     try:
         # Verify token with Firebase
-        decoded_token = firebase_auth.verify_id_token(id_token)
+        decoded_token = _verify_firebase_token(id_token)
         
         return {
             'user_id': decoded_token.get('uid'),
@@ -88,25 +220,37 @@ def verify_google_token(id_token: str) -> Dict[str, Any]:
     except Exception as e:
         # Mock verification for development
         print(f"⚠️  Google token verification failed: {e}. Using mock mode.")
+        suffix = secrets.token_bytes(12).hex()
         return {
-            'user_id': f"google_{secrets.token_hex(8)}",
-            'email': f"google_user_{secrets.token_hex(4)}@gmail.com",
+            'user_id': f"google_{suffix[:16]}",
+            'email': f"google_user_{suffix[16:]}@gmail.com",
             'email_verified': True,
             'name': "Google User",
             'provider': 'google.com'
         }
 
 
+def _utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 with microseconds and a Z suffix, e.g. 2024-11-24T08:00:00.000000Z"""
+    t = time.time()
+    i = int(t)
+    us = int((t - i) * 1_000_000)
+    tm = time.gmtime(i)
+    return (f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+            f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{us:06d}Z")
+
+
 def create_user(user_id: str, email: Optional[str], display_name: Optional[str], 
                 provider: str, photo_url: Optional[str] = None) -> Dict[str, Any]:
     """Create or update user in database"""
+    now_iso = _utc_now_iso()
     
-    if user_id in users_db:
+    user = users_db.get(user_id)
+    if user is not None:
         # Update existing user
-        user = users_db[user_id]
         if provider not in user['providers']:
             user['providers'].append(provider)
-        user['last_sign_in'] = datetime.utcnow().isoformat() + 'Z'
+        user['last_sign_in'] = now_iso
         is_new = False
     else:
         # Create new user
@@ -116,51 +260,144 @@ def create_user(user_id: str, email: Optional[str], display_name: Optional[str],
             'display_name': display_name,
             'photo_url': photo_url,
             'providers': [provider],
-            'created_at': datetime.utcnow().isoformat() + 'Z',
-            'last_sign_in': datetime.utcnow().isoformat() + 'Z',
-            'trips': [],
+            'created_at': now_iso,
+            'last_sign_in': now_iso,
+            'trips': {},  # trip id -> trip
             'preferences': {}
         }
-        users_db[user_id] = user
+        users_db.put(user_id, user)
+        if email:
+            email_to_user_id.setdefault(email, user_id)
         is_new = True
     
     return user, is_new
 
 
-def generate_jwt_token(user_id: str) -> tuple[str, str, int]:
-    """Generate JWT access token and refresh token"""
-    expires_at = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
+def _encode_jwt(payload: Dict[str, Any]) -> str:
+    """Sign payload as an HS256 JWT using the precomputed header and key"""
+    signing_input = _JWT_HEADER_B64 + b'.' + base64.urlsafe_b64encode(orjson.dumps(payload)).rstrip(b'=')
+    signature = hmac.new(_JWT_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b'.' + base64.urlsafe_b64encode(signature).rstrip(b'=')).decode('ascii')
+
+
+def _fresh_ids() -> tuple[str, str]:
+    """
+    Draw a new user id suffix (24 hex chars) and refresh token from a single urandom read
+    
+    Same sizes as secrets.token_hex(12) and secrets.token_urlsafe(32).
+    """
+    raw = secrets.token_bytes(44)
+    return raw[:12].hex(), base64.urlsafe_b64encode(raw[12:]).rstrip(b'=').decode('ascii')
+
+
+def generate_jwt_token(user_id: str, refresh_token: Optional[str] = None) -> tuple[str, str, int]:
+    """Generate JWT access token and refresh token (pass refresh_token to reuse one already drawn)"""
+    now = int(time.time())
+    expires_in = int(JWT_EXPIRATION_HOURS * 3600)
     
     payload = {
         'user_id': user_id,
-        'exp': expires_at,
-        'iat': datetime.utcnow()
+        'exp': now + expires_in,
+        'iat': now
     }
     
-    access_token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    refresh_token = secrets.token_urlsafe(32)
-    expires_in = int(JWT_EXPIRATION_HOURS * 3600)
+    access_token = _encode_jwt(payload)
+    if refresh_token is None:
+        refresh_token = secrets.token_urlsafe(32)
     
     return access_token, refresh_token, expires_in
 
 
-def verify_jwt_token(token: str) -> Optional[str]:
-    """Verify JWT token and return user_id"""
+def _decode_jwt(token: str) -> Optional[tuple[str, float]]:
+    """
+    Verify a token's signature once and return (user_id, exp), or None if it is invalid
+    
+    Only successful decodes are cached, keyed by the token's SHA-256, so garbage tokens
+    cannot evict valid entries and raw tokens are never held in memory.
+    """
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    with _jwt_cache_lock:
+        cached = _JWT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload.get('user_id')
     except JWTError:
         return None
+    user_id, exp = payload.get('user_id'), payload.get('exp')
+    if not isinstance(user_id, str) or not isinstance(exp, (int, float)):
+        return None
+    
+    with _jwt_cache_lock:
+        _JWT_CACHE[key] = (user_id, exp)
+        _JWT_CACHE.move_to_end(key)
+        if len(_JWT_CACHE) > _JWT_CACHE_MAX:
+            _JWT_CACHE.popitem(last=False)
+    return user_id, exp
 
 
-def hash_password(password: str) -> str:
-    """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def verify_jwt_token(token: str) -> Optional[str]:
+    """
+    Verify JWT token and return user_id
+    
+    Access tokens are HS256-signed with the local JWT_SECRET, so verification never
+    fetches or parses remote keys. Apple/Google ID tokens are verified by Firebase,
+    whose verifier caches Google's public certificates per their Cache-Control headers.
+    Decoded tokens are cached, so a repeat call only re-checks exp against the clock.
+    """
+    decoded = _decode_jwt(token)
+    if decoded is None or decoded[1] <= time.time():
+        return None
+    return decoded[0]
+
+
+def check_password_length(password: str) -> None:
+    """Reject passwords outside 1-128 characters before they reach the hasher"""
+    if not isinstance(password, str) or not 1 <= len(password) <= MAX_PASSWORD_LENGTH:
+        raise ValueError(f"Password must be 1-{MAX_PASSWORD_LENGTH} characters")
+
 
+def hash_password(password: str) -> bytes:
+    """Hash password with pwd_ctx's default scheme, Argon2id (runs on the hash thread pool)"""
+    return _hash_pool.submit(pwd_ctx.hash, password).result().encode('ascii')
+
+
+def verify_password(password: str, hashed: bytes) -> bool:
+    """
+    Verify password against a pwd_ctx hash or a legacy plain bcrypt hash
+    
+    Both argon2 and bcrypt.checkpw compare in constant time; any fast path added in front
+    of them (cached results, token shortcuts) must compare with secure_compare.
+    """
+    if hashed.startswith(_BCRYPT_PREFIX):
+        return _hash_pool.submit(bcrypt.checkpw, password.encode('utf-8'), hashed).result()
+    return _hash_pool.submit(pwd_ctx.verify, password, hashed.decode('ascii')).result()
 
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+def password_needs_rehash(hashed: bytes) -> bool:
+    """Whether hashed uses a legacy scheme or outdated cost and should be replaced after a successful sign-in"""
+    if hashed.startswith(_BCRYPT_PREFIX):
+        return True
+    return pwd_ctx.needs_update(hashed.decode('ascii'))
+
+
+def _build_auth_response(user: Dict[str, Any], is_new: bool,
+                         refresh_token: Optional[str] = None) -> Dict[str, Any]:
+    """Issue fresh tokens for user and build the response shared by every sign-in endpoint"""
+    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'], refresh_token)
+    
+    return {
+        'user_id': user['user_id'],
+        'email': user.get('email'),
+        'display_name': user.get('display_name'),
+        'photo_url': user.get('photo_url'),
+        'providers': list(user['providers']),
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'expires_in': expires_in,
+        'is_new_user': is_new
+    }
 
 
 def authenticate_with_apple(id_token: str, nonce: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -180,19 +417,7 @@ def authenticate_with_apple(id_token: str, nonce: str, user_data: Dict[str, Any]
         verified['provider']
     )
     
-    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'])
-    
-    return {
-        'user_id': user['user_id'],
-        'email': user['email'],
-        'display_name': user['display_name'],
-        'photo_url': user.get('photo_url'),
-        'providers': user['providers'],
-        'access_token': access_token,
-        'refresh_token': refresh_token,
-        'expires_in': expires_in,
-        'is_new_user': is_new
-    }
+    return _build_auth_response(user, is_new)
 
 
 def authenticate_with_google(id_token: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -212,128 +437,107 @@ def authenticate_with_google(id_token: str, user_data: Dict[str, Any]) -> Dict[s
         photo_url
     )
     
-    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'])
-    
-    return {
-        'user_id': user['user_id'],
-        'email': user['email'],
-        'display_name': user['display_name'],
-        'photo_url': user.get('photo_url'),
-        'providers': user['providers'],
-        'access_token': access_token,
-        'refresh_token': refresh_token,
-        'expires_in': expires_in,
-        'is_new_user': is_new
-    }
+    return _build_auth_response(user, is_new)
+
+
+def _password_user(email: str) -> Optional[Dict[str, Any]]:
+    """Return the account that signs in with this email and a password, if any"""
+    # The index also holds OAuth emails, which must never unlock a password set under another email
+    user = users_db.get(email_to_user_id.get(email))
+    if user is not None and user.get('password_email') == email:
+        return user
+    return None
+
+
+def email_in_use(email: str) -> bool:
+    """Whether a password account is already registered with this email"""
+    return _password_user(email) is not None
 
 
 def authenticate_with_email(email: str, password: str) -> Dict[str, Any]:
     """Authenticate user with email/password"""
+    check_password_length(password)
     
-    # Check if email exists
-    if email not in email_passwords:
-        raise ValueError("User not found")
+    # Find user by email; unknown emails still pay for a hash check and get the same
+    # error as a wrong password, so neither timing nor status reveals which emails exist
+    user = _password_user(email)
+    if user is None:
+        verify_password(password, _DUMMY_HASH)
+        raise InvalidCredentialsError("Invalid credentials")
     
     # Verify password
-    if not verify_password(password, email_passwords[email]):
-        raise ValueError("Invalid credentials")
+    if not verify_password(password, user['password_hash']):
+        raise InvalidCredentialsError("Invalid credentials")
     
-    # Find user by email
-    user = next((u for u in users_db.values() if u.get('email') == email), None)
-    if not user:
-        raise ValueError("User not found")
+    # Upgrade legacy hashes while the plaintext is at hand
+    if password_needs_rehash(user['password_hash']):
+        user['password_hash'] = hash_password(password)
     
     # Update last sign-in
-    user['last_sign_in'] = datetime.utcnow().isoformat() + 'Z'
+    user['last_sign_in'] = _utc_now_iso()
     
-    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'])
-    
-    return {
-        'user_id': user['user_id'],
-        'email': user['email'],
-        'display_name': user['display_name'],
-        'providers': user['providers'],
-        'access_token': access_token,
-        'refresh_token': refresh_token,
-        'expires_in': expires_in,
-        'is_new_user': False
-    }
+    return _build_auth_response(user, False)
 
 
 def create_email_user(email: str, password: str, display_name: Optional[str]) -> Dict[str, Any]:
     """Create new user with email/password"""
+    check_password_length(password)
     
     # Check if email already exists
-    if email in email_passwords:
-        raise ValueError("Email already in use")
+    if email_in_use(email):
+        raise EmailInUseError("Email already in use")
     
-    # Hash password
+    # Hash password; re-check afterwards since hashing yields to other greenlets
     hashed_password = hash_password(password)
-    email_passwords[email] = hashed_password
+    if email_in_use(email):
+        raise EmailInUseError("Email already in use")
     
     # Create user
-    user_id = f"email_{secrets.token_hex(12)}"
+    id_suffix, refresh_token = _fresh_ids()
+    user_id = f"email_{id_suffix}"
     user, is_new = create_user(
         user_id,
         email,
         display_name,
         'password'
     )
+    user['password_hash'] = hashed_password
+    user['password_email'] = email
+    email_to_user_id[email] = user_id
     
-    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'])
-    
-    return {
-        'user_id': user['user_id'],
-        'email': user['email'],
-        'display_name': user['display_name'],
-        'providers': user['providers'],
-        'access_token': access_token,
-        'refresh_token': refresh_token,
-        'expires_in': expires_in,
-        'is_new_user': True
-    }
+    return _build_auth_response(user, True, refresh_token)
 
 
 def link_provider_to_user(user_id: str, provider: str, provider_data: Dict[str, Any]) -> Dict[str, Any]:
     """Link additional provider to existing user"""
     
-    if user_id not in users_db:
-        raise ValueError("User not found")
-    
-    user = users_db[user_id]
+    user = users_db.get(user_id)
+    if user is None:
+        raise UserNotFoundError("User not found")
     
     # Check if provider already linked
     if provider in user['providers']:
         raise ValueError(f"Provider {provider} already linked")
+    if provider == 'password' and email_in_use(provider_data['email']):
+        raise EmailInUseError("Email already in use")
     
     # Add provider
     user['providers'].append(provider)
-    user['last_sign_in'] = datetime.utcnow().isoformat() + 'Z'
+    user['last_sign_in'] = _utc_now_iso()
     
     # Update user data if provided
     if provider_data.get('email') and not user.get('email'):
         user['email'] = provider_data['email']
+        email_to_user_id.setdefault(user['email'], user_id)
+    if provider == 'password':
+        # Password sign-in looks the account up by the linked email
+        user['password_hash'] = provider_data['password_hash']
+        user['password_email'] = provider_data['email']
+        email_to_user_id[provider_data['email']] = user_id
     if provider_data.get('display_name') and not user.get('display_name'):
         user['display_name'] = provider_data['display_name']
     if provider_data.get('photo_url') and not user.get('photo_url'):
         user['photo_url'] = provider_data['photo_url']
     
-    # Generate new tokens
-    access_token, refresh_token, expires_in = generate_jwt_token(user['user_id'])
-    
-    return {
-        'user_id': user['user_id'],
-        'email': user['email'],
-        'display_name': user['display_name'],
-        'photo_url': user.get('photo_url'),
-        'providers': user['providers'],
-        'access_token': access_token,
-        'refresh_token': refresh_token,
-        'expires_in': expires_in,
-        'is_new_user': False
-    }
-
-
-# Initialize Firebase on import
-initialize_firebase()
+    return _build_auth_response(user, False)
 
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for the CommuteTimely server
+
+Usage: gunicorn -c gunicorn_conf.py app:app
+"""
+
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# gevent workers keep I/O-bound auth handlers from blocking one another
+worker_class = 'gevent'
+worker_connections = 1000
+
+# Users, password hashes and trips live in each process's in-memory store, so a second
+# worker would not see accounts created in the first. Stay at one worker and let gevent's
+# worker_connections carry concurrency until storage is shared across processes.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Import the app (and compile the prediction kernel) once in the master,
+# then fork so workers share those pages copy-on-write
+preload_app = True
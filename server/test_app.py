@@ -0,0 +1,191 @@
+"""
+Tests for the prediction, auth and sync endpoints
+
+Run from server/: python -m pytest -q
+"""
+
+import copy
+import random
+
+import numpy as np
+import pytest
+
+import app as app_module
+
+
+PREDICT_REQUEST = {
+    "origin": {"latitude": 37.7749, "longitude": -122.4194},
+    "destination": {"latitude": 37.8044, "longitude": -122.2712},
+    "arrival_time": "2024-11-24T09:00:00Z",
+    "current_time": "2024-11-24T08:00:00Z",
+    "route_features": {
+        "distance": 15000,
+        "baseline_duration": 1200,
+        "current_traffic_delay": 180,
+        "incident_count": 1,
+        "congestion_level": 2
+    },
+    "weather_features": {
+        "precipitation_probability": 45,
+        "visibility": 7,
+        "weather_score": 65
+    }
+}
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def _with_route(**fields):
+    data = copy.deepcopy(PREDICT_REQUEST)
+    data['route_features'].update(fields)
+    return data
+
+
+def test_scalar_and_vectorised_kernels_agree():
+    rng = random.Random(1234)
+    rows = [
+        (
+            rng.uniform(0, 7200),
+            rng.uniform(0, 1800),
+            rng.randint(0, 10),
+            rng.randint(0, 4),
+            rng.uniform(0, 100),
+            rng.uniform(0, 100),
+            rng.uniform(0, 20),
+            rng.uniform(-3600, 6 * 3600)
+        )
+        for _ in range(500)
+    ]
+
+    columns = np.array(rows, dtype=np.float64).T
+    batch = np.stack(app_module._predict_core_batch(*columns), axis=1)
+    scalar = np.array([app_module._predict_core(*row) for row in rows])
+
+    np.testing.assert_array_equal(scalar, batch)
+
+
+@pytest.mark.parametrize('size', [3, app_module._BULK_VECTORIZE_MIN + 5])
+def test_bulk_matches_single_predictions(client, size):
+    single = client.post('/predict', json=PREDICT_REQUEST).get_json()
+    predictions = client.post('/predict/bulk', json={'requests': [PREDICT_REQUEST] * size}).get_json()['predictions']
+
+    for prediction in predictions:
+        prediction.pop('calculated_at')
+    single.pop('calculated_at')
+    assert predictions == [single] * size
+
+
+@pytest.mark.parametrize('size', [3, app_module._BULK_VECTORIZE_MIN + 5])
+def test_bulk_reports_bad_entries_inline(client, size):
+    overflow = _with_route(baseline_duration=1e20)
+    missing = copy.deepcopy(PREDICT_REQUEST)
+    del missing['route_features']
+
+    response = client.post('/predict/bulk', json={'requests': [overflow, missing] + [PREDICT_REQUEST] * (size - 2)})
+
+    assert response.status_code == 200
+    predictions = response.get_json()['predictions']
+    assert predictions[0] == {'error': 'Predicted leave time is out of range'}
+    assert 'error' in predictions[1]
+    assert all('leave_time' in p for p in predictions[2:])
+
+
+@pytest.mark.parametrize('level', [-1000000000, -1, 5])
+def test_congestion_level_out_of_range_is_rejected(client, level):
+    response = client.post('/predict', json=_with_route(congestion_level=level))
+    assert response.status_code == 400
+
+
+def test_naive_timestamps_are_treated_as_utc(client):
+    naive = copy.deepcopy(PREDICT_REQUEST)
+    naive['arrival_time'] = '2024-11-24T09:00:00'
+    naive['current_time'] = '2024-11-24T08:00:00'
+    expected = client.post('/predict', json=PREDICT_REQUEST).get_json()
+
+    assert client.post('/predict', json=naive).get_json() == expected
+
+    del naive['current_time']
+    assert client.post('/predict', json=naive).status_code == 200
+
+
+def test_link_batch_skips_duplicates_and_reports_each_result_separately(client, monkeypatch):
+    hashed = []
+    hash_password = app_module.auth_service.hash_password
+    monkeypatch.setattr(app_module.auth_service, 'hash_password', lambda p: hashed.append(p) or hash_password(p))
+
+    token = client.post('/auth/google', json={'id_token': 'mock'}).get_json()['access_token']
+    response = client.post('/auth/link/batch', headers={'Authorization': f'Bearer {token}'}, json={'providers': [
+        {'provider': 'password', 'email': 'batch@example.com', 'password': 'first'},
+        {'provider': 'password', 'email': 'other@example.com', 'password': 'second'},
+        {'provider': 'apple', 'id_token': 'mock', 'nonce': 'n'}
+    ]})
+
+    first, duplicate, apple = response.get_json()['results']
+    assert first['providers'] == ['google.com', 'password']
+    assert duplicate == {'error': 'Provider password already linked'}
+    assert apple['providers'] == ['google.com', 'password', 'apple']
+    assert hashed == ['first']
+
+
+@pytest.mark.parametrize('body', [[1], {'requests': 5}, {'requests': [PREDICT_REQUEST] * (app_module._BULK_PREDICT_MAX + 1)}])
+def test_bulk_rejects_malformed_batches(client, body):
+    assert client.post('/predict/bulk', json=body).status_code == 400
+
+
+def test_link_batch_size_limit(client):
+    token = client.post('/auth/google', json={'id_token': 'mock'}).get_json()['access_token']
+    response = client.post('/auth/link/batch', headers={'Authorization': f'Bearer {token}'},
+                           json={'providers': [{'provider': 'apple'}] * (app_module._LINK_BATCH_MAX + 1)})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('route_fields', [{'distance': None}, {'incident_count': [1]}])
+def test_wrongly_typed_fields_are_client_errors(client, route_fields):
+    response = client.post('/predict', json=_with_route(**route_fields))
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid data format')
+
+    predictions = client.post('/predict/bulk', json={'requests': [_with_route(**route_fields)]}).get_json()['predictions']
+    assert 'error' in predictions[0]
+
+
+def test_linked_password_only_unlocks_its_own_email(client):
+    token = client.post('/auth/apple', json={
+        'id_token': 'mock', 'nonce': 'n', 'user': {'email': 'victim@example.com'}
+    }).get_json()['access_token']
+    response = client.post('/auth/link', headers={'Authorization': f'Bearer {token}'},
+                           json={'provider': 'password', 'email': 'attacker@example.com', 'password': 'pw'})
+    assert response.status_code == 200
+
+    assert client.post('/auth/email/signin', json={'email': 'victim@example.com', 'password': 'pw'}).status_code == 401
+    assert client.post('/auth/email/signin', json={'email': 'attacker@example.com', 'password': 'pw'}).status_code == 200
+    assert client.post('/auth/email/signup', json={'email': 'victim@example.com', 'password': 'other'}).status_code == 201
+    assert client.post('/auth/email/signin', json={'email': 'victim@example.com', 'password': 'other'}).status_code == 200
+
+
+@pytest.mark.parametrize('trip', [1, {'x': 1}, {'id': ['x']}, {'id': 7}])
+def test_trips_need_string_ids(client, trip):
+    token = client.post('/auth/google', json={'id_token': 'mock'}).get_json()['access_token']
+    response = client.post('/sync/trips', headers={'Authorization': f'Bearer {token}'}, json={'trips': [trip]})
+    assert response.status_code == 400
+
+
+def test_access_token_without_exp_is_unauthorized(client):
+    token = app_module.auth_service.jwt.encode({'user_id': 'someone'}, app_module.auth_service.JWT_SECRET, algorithm='HS256')
+    response = client.get('/auth/me', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+
+
+def test_only_valid_access_tokens_are_cached(client):
+    cache = app_module.auth_service._JWT_CACHE
+    cache.clear()
+    for i in range(10):
+        assert client.get('/auth/me', headers={'Authorization': f'Bearer junk{i}'}).status_code == 401
+    assert len(cache) == 0
+
+    token = client.post('/auth/google', json={'id_token': 'mock'}).get_json()['access_token']
+    assert client.get('/auth/me', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    assert list(cache) == [app_module.auth_service.hashlib.sha256(token.encode()).digest()]